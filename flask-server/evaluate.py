@@ -0,0 +1,289 @@
+"""Offline relevance and latency evaluation harness.
+
+Replays queries captured by the query log against one or more candidate
+index builds and reports nDCG@10 / MRR next to latency percentiles and
+index memory, so ranking and performance changes can be compared.
+
+Relevance judgments default to pseudo-qrels built from the results each
+logged query returned in production (top 3 graded 2, the rest 1). Pass
+--qrels with TREC qrels to use real judgments; --write-qrels exports the
+pseudo-qrels as a starting point. Query IDs are get_cache_key(endpoint, query,
+limit), and each query is replayed with the page size it was logged with.
+
+Usage:
+    python evaluate.py logs/queries.jsonl \\
+        --candidate features5k:TFIDF_MAX_FEATURES=5000 \\
+        --candidate content70:RECOMMEND_CONTENT_WEIGHT=0.7,RECOMMEND_TITLE_WEIGHT=0.3
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from system import (
+    system,
+    config,
+    logger,
+    get_cache_key,
+    initialize_tfidf_system,
+    initialize_recommendation_system,
+    wait_for_startup,
+    wait_for_bm25,
+    run_search,
+    generate_recommendations,
+)
+
+SEARCH_METHODS = {"BM25": "bm25", "TF-IDF": "tfidf", "bm25": "bm25", "tfidf": "tfidf"}
+
+def read_query_log(path):
+    """Read a query log and its rotated backups, oldest first."""
+    backups = [p for p in glob.glob(f"{path}.*") if p[len(path) + 1:].isdigit()]
+    paths = sorted(backups, key=lambda p: int(p[len(path) + 1:]), reverse=True) + [path]
+    entries = []
+    for log_path in paths:
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+def build_workload(entries):
+    """Deduplicate logged queries and derive pseudo-qrels from logged results.
+    
+    Labels come from the newest index generation a query was logged under,
+    so results from an older build never grade the current one.
+    """
+    generation_last_seen = {}
+    for entry in entries:
+        generation = entry.get("index_generation")
+        generation_last_seen[generation] = max(generation_last_seen.get(generation, 0), entry.get("ts", 0))
+
+    workload = {}
+    labels = {}
+    for entry in entries:
+        endpoint = entry.get("endpoint", "search")
+        query = entry.get("query")
+        # Replays run unfiltered first pages, so only those make comparable labels
+        if not query or entry.get("offset") or entry.get("topics"):
+            continue
+        default_limit = config.MAX_RECOMMENDATIONS if endpoint == "recommend" else config.MAX_RESULTS
+        limit = entry.get("limit") or default_limit
+        if not isinstance(limit, int) or limit < 1:
+            continue
+        qid = get_cache_key(endpoint, query, limit)
+        workload.setdefault(qid, (endpoint, query, entry.get("method"), limit))
+        result_ids = entry.get("result_ids")
+        if not result_ids:
+            continue
+        rank_key = (generation_last_seen[entry.get("index_generation")], entry.get("ts", 0))
+        if qid not in labels or rank_key > labels[qid][0]:
+            labels[qid] = (rank_key, result_ids)
+
+    qrels = {
+        qid: {doc: (2 if rank < 3 else 1) for rank, doc in enumerate(result_ids) if doc}
+        for qid, (_, result_ids) in labels.items()
+    }
+    return workload, qrels
+
+def read_trec_qrels(path):
+    """Read TREC-format qrels (qid iter docid rel)."""
+    qrels = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 4:
+                qrels.setdefault(parts[0], {})[parts[2]] = int(parts[3])
+    return qrels
+
+def write_trec_qrels(path, qrels):
+    with open(path, 'w', encoding='utf-8') as f:
+        for qid, docs in qrels.items():
+            for doc, rel in docs.items():
+                f.write(f"{qid} 0 {doc} {rel}\n")
+
+def parse_candidate(spec):
+    """Parse NAME:KEY=VALUE,KEY=VALUE into (name, overrides)."""
+    name, _, settings = spec.partition(':')
+    overrides = {}
+    for item in filter(None, settings.split(',')):
+        key, _, value = item.partition('=')
+        overrides[key.strip()] = value.strip()
+    return name, overrides
+
+def apply_overrides(overrides):
+    """Apply config overrides and rebuild the index; returns build seconds."""
+    search_method = overrides.pop("method", None)
+    data_path = overrides.pop("DATA", None)
+    for key, value in overrides.items():
+        if not hasattr(config, key):
+            raise ValueError(f"Unknown config setting: {key}")
+        setattr(config, key, type(getattr(config, key))(value))
+
+    if data_path:
+        os.environ["DATA"] = data_path
+        system.articles_df = None
+
+    start = time.perf_counter()
+    if not initialize_tfidf_system() or not initialize_recommendation_system():
+        raise RuntimeError("Candidate index build failed")
+    return time.perf_counter() - start, search_method
+
+def index_memory_bytes():
+    """Approximate memory held by the search and recommendation matrices."""
+    total = 0
+    for name in ("tfidf_matrix", "content_tfidf_matrix", "title_tfidf_matrix",
+                 "content_similarity_matrix", "title_similarity_matrix"):
+        matrix = getattr(system, name, None)
+        if matrix is None:
+            continue
+        if hasattr(matrix, "indptr"):
+            total += matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        else:
+            total += matrix.nbytes
+    return total
+
+def process_rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+def replay(workload, search_method=None, repeats=1):
+    """Replay the workload, returning ranked doc IDs, per-endpoint latencies
+    and how many logged BM25 queries had to be replayed on TF-IDF.
+    """
+    if search_method == "bm25" and not system.bm25_available:
+        raise RuntimeError("BM25 requested but not available")
+    runs = {}
+    latencies = {"search": [], "recommend": []}
+    bm25_fallbacks = 0
+    for qid, (endpoint, query, logged_method, limit) in workload.items():
+        method = search_method or SEARCH_METHODS.get(logged_method, "tfidf")
+        if endpoint == "search" and method == "bm25" and not system.bm25_available:
+            method = "tfidf"
+            bm25_fallbacks += 1
+        for _ in range(repeats):
+            # Score cold: drop cached candidates so every replay rescores
+            system.candidate_cache.clear()
+            start = time.perf_counter()
+            if endpoint == "recommend":
+                results = generate_recommendations(query, limit)
+            else:
+                results, _, _ = run_search(query, limit, method)
+            latencies.setdefault(endpoint, []).append((time.perf_counter() - start) * 1000)
+        runs[qid] = [item["url"] for item in results]
+    return runs, latencies, bm25_fallbacks
+
+def relevance_metrics(runs, qrels, workload, endpoint):
+    """nDCG@10 and MRR over queries of one endpoint that have judgments."""
+    import ir_measures
+    from ir_measures import nDCG, RR
+
+    judged = [qid for qid in runs if qid in qrels and workload[qid][0] == endpoint]
+    if not judged:
+        return {"judged_queries": 0}
+    qrel_list = [ir_measures.Qrel(qid, doc, rel) for qid in judged for doc, rel in qrels[qid].items()]
+    run_list = [
+        ir_measures.ScoredDoc(qid, doc, float(len(runs[qid]) - rank))
+        for qid in judged for rank, doc in enumerate(runs[qid])
+    ]
+    scores = ir_measures.calc_aggregate([nDCG@10, RR], qrel_list, run_list)
+    return {
+        "judged_queries": len(judged),
+        "ndcg@10": round(scores[nDCG@10], 4),
+        "mrr": round(scores[RR], 4)
+    }
+
+def latency_summary(values):
+    if not values:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3)}
+
+def evaluate_candidate(name, overrides, workload, qrels, repeats):
+    defaults = {key: getattr(config, key) for key in overrides if hasattr(config, key)}
+    data_before = os.environ.get("DATA")
+    try:
+        build_seconds, search_method = apply_overrides(dict(overrides))
+        runs, latencies, bm25_fallbacks = replay(workload, search_method, repeats)
+        report = {"candidate": name, "overrides": overrides, "build_seconds": round(build_seconds, 3),
+                  "index_bytes": index_memory_bytes(), "rss_bytes": process_rss_bytes()}
+        if bm25_fallbacks:
+            logger.warning(f"{name}: BM25 unavailable, {bm25_fallbacks} logged BM25 queries replayed on TF-IDF")
+            report["bm25_fallback_queries"] = bm25_fallbacks
+        for endpoint, values in latencies.items():
+            report[endpoint] = dict(relevance_metrics(runs, qrels, workload, endpoint),
+                                    queries=len(values) // max(repeats, 1), **latency_summary(values))
+        return report
+    except RuntimeError as e:
+        logger.error(f"Candidate '{name}' failed: {e}")
+        return {"candidate": name, "overrides": overrides, "error": str(e)}
+    finally:
+        for key, value in defaults.items():
+            setattr(config, key, value)
+        if "DATA" in overrides:
+            if data_before is None:
+                os.environ.pop("DATA", None)
+            else:
+                os.environ["DATA"] = data_before
+            system.articles_df = None
+
+def print_report(reports):
+    for report in reports:
+        print(f"\n== {report['candidate']} {report['overrides'] or ''}")
+        if "error" in report:
+            print(f"   failed: {report['error']}")
+            continue
+        print(f"   build {report['build_seconds']}s, index {report['index_bytes'] / 1e6:.1f} MB"
+              + (f", rss {report['rss_bytes'] / 1e6:.1f} MB" if report['rss_bytes'] else ""))
+        for endpoint in ("search", "recommend"):
+            stats = report.get(endpoint)
+            if stats and stats.get("queries"):
+                print(f"   {endpoint:<9} " + "  ".join(f"{k}={v}" for k, v in stats.items()))
+        if report.get("bm25_fallback_queries"):
+            print(f"   warning: {report['bm25_fallback_queries']} BM25 queries replayed on TF-IDF (BM25 unavailable)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay query logs against candidate index builds")
+    parser.add_argument("query_log", nargs="?", default=config.QUERY_LOG_PATH, help="Query log JSONL path")
+    parser.add_argument("--candidate", action="append", default=[],
+                        help="NAME:KEY=VALUE,... config overrides (method=bm25|tfidf, DATA=<csv>)")
+    parser.add_argument("--qrels", help="TREC qrels file (defaults to pseudo-qrels from the log)")
+    parser.add_argument("--write-qrels", help="Write the pseudo-qrels derived from the log")
+    parser.add_argument("--repeats", type=int, default=3, help="Replays per query for latency")
+    parser.add_argument("--json", help="Write the report as JSON")
+    args = parser.parse_args()
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    wait_for_startup()
+    wait_for_bm25()
+    workload, qrels = build_workload(read_query_log(args.query_log))
+    if not workload:
+        logger.error(f"No queries found in {args.query_log}")
+        return 1
+    if args.write_qrels:
+        write_trec_qrels(args.write_qrels, qrels)
+    if args.qrels:
+        qrels = read_trec_qrels(args.qrels)
+
+    candidates = [("baseline", {})] + [parse_candidate(spec) for spec in args.candidate]
+    reports = [evaluate_candidate(name, overrides, workload, qrels, args.repeats)
+               for name, overrides in candidates]
+
+    print_report(reports)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+"""Offline precompute stage for head queries and article recommendations.
+
+Builds the /recommend response for every article and the /search response
+for the top-N queries of a query log, then writes them to a compact
+key -> payload file that system.py memory-maps at startup.
+
+Usage:
+    python precompute.py --query-log logs/queries.jsonl --top-queries 500
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+
+from system import (
+    system,
+    config,
+    logger,
+    get_cache_key,
+    validate_input,
+    resolve_search_method,
+    run_search,
+    next_page_cursor,
+    build_search_response,
+    generate_recommendations,
+    build_recommendation_response,
+    PRECOMPUTED_MAGIC,
+    PRECOMPUTED_HEADER,
+    wait_for_startup,
+    wait_for_bm25,
+)
+
+def serialize_payload(response_data, items):
+    """Serialize a response exactly as a cache hit should return it, plus its result IDs."""
+    payload = dict(response_data, cached=True, precomputed=True)
+    body = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return body, [item.get("url") for item in items]
+
+def read_top_queries(log_path, top_n):
+    """Count sanitized queries in a JSONL (or one-query-per-line) log."""
+    counts = Counter()
+    with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                if isinstance(record, dict) and (record.get('endpoint', 'search') != 'search'
+                                                 or record.get('offset') or record.get('topics')):
+                    continue
+                query = record.get('query', '') if isinstance(record, dict) else str(record)
+            except ValueError:
+                query = line
+            is_valid, sanitized, _ = validate_input(query)
+            if is_valid:
+                counts[sanitized] += 1
+    return [query for query, _ in counts.most_common(top_n)]
+
+def precompute_recommendations(entries):
+    """Generate /recommend payloads for every article title."""
+    limit = config.MAX_RECOMMENDATIONS
+    for title in system.articles_df['title']:
+        is_valid, sanitized_title, _ = validate_input(str(title), 200)
+        if not is_valid:
+            continue
+        cache_key = get_cache_key("recommend", sanitized_title, limit)
+        if cache_key in entries:
+            continue
+        start_time = time.time()
+        recommendations = generate_recommendations(sanitized_title, limit)
+        entries[cache_key] = serialize_payload(build_recommendation_response(
+            sanitized_title, recommendations, time.time() - start_time
+        ), recommendations)
+
+def precompute_searches(entries, queries, methods):
+    """Generate /search payloads for head queries on each requested method."""
+    limit = config.MAX_RESULTS
+    for prefer_method in methods:
+        resolved_method = resolve_search_method(prefer_method)
+        if resolved_method is None:
+            logger.warning(f"No search backend available for method '{prefer_method}'")
+            continue
+        logger.info(f"Precomputing searches for method '{prefer_method or 'default'}' on {resolved_method}")
+        for query in queries:
+            cache_key = get_cache_key("search", query, limit, resolved_method)
+            if cache_key in entries:
+                continue
+            start_time = time.time()
+            results, search_method, total_candidates = run_search(query, limit, resolved_method)
+            entries[cache_key] = serialize_payload(build_search_response(
+                query, results, search_method, time.time() - start_time,
+                total_candidates=total_candidates,
+                next_cursor=next_page_cursor(query, resolved_method, limit, 0, total_candidates)
+            ), results)
+
+def write_precomputed_cache(path, entries):
+    """Write entries as magic + header length + JSON header + payload blob."""
+    offsets = {}
+    position = 0
+    for key, (payload, result_ids) in entries.items():
+        offsets[key] = [position, len(payload), result_ids]
+        position += len(payload)
+
+    header = json.dumps({
+        "index_generation": system.index_generation,
+        "created": time.time(),
+        "entries": offsets
+    }, separators=(',', ':')).encode('utf-8')
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PRECOMPUTED_MAGIC)
+        f.write(PRECOMPUTED_HEADER.pack(len(header)))
+        f.write(header)
+        for payload, _ in entries.values():
+            f.write(payload)
+    os.replace(tmp_path, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute search and recommendation responses")
+    parser.add_argument("--query-log", help="JSONL query log (or one query per line)")
+    parser.add_argument("--top-queries", type=int, default=500, help="Number of head queries to precompute")
+    parser.add_argument("--methods", default="", help="Comma-separated search methods to precompute ('' = default backend)")
+    parser.add_argument("--bm25-wait", type=float, default=None,
+                        help="Max seconds to wait for the BM25 startup phase (default: until it finishes)")
+    parser.add_argument("--output", default=config.PRECOMPUTED_CACHE_PATH, help="Output cache file")
+    args = parser.parse_args()
+
+    wait_for_startup()
+    if not system.tfidf_ready:
+        logger.error("TF-IDF system not ready - nothing to precompute")
+        return 1
+
+    if not wait_for_bm25(args.bm25_wait):
+        logger.warning(f"BM25 still starting after {args.bm25_wait}s - precomputing without it")
+    elif not system.bm25_available:
+        logger.warning("BM25 unavailable - search entries will be keyed for TF-IDF")
+
+    entries = {}
+    precompute_recommendations(entries)
+    logger.info(f"Precomputed {len(entries)} recommendation responses")
+
+    if args.query_log:
+        queries = read_top_queries(args.query_log, args.top_queries)
+        methods = [m.strip().lower() for m in args.methods.split(',')]
+        before = len(entries)
+        precompute_searches(entries, queries, methods)
+        logger.info(f"Precomputed {len(entries) - before} search responses for {len(queries)} head queries")
+
+    write_precomputed_cache(args.output, entries)
+    logger.info(f"Wrote {len(entries)} responses to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
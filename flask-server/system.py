@@ -1,19 +1,32 @@
-from flask import Flask, request, jsonify
-import pandas as pd
+import time
+_module_import_start = time.perf_counter()
+
+from flask import Flask, request, jsonify, g
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from flask_cors import CORS
 import os
 import logging
-import time
 import threading
 from functools import wraps
 from datetime import datetime
 import hashlib
-from collections import defaultdict
+import base64
+import gzip
+import re
+import json
+import mmap
+import queue
+import random
+import struct
+import atexit
+from collections import defaultdict, OrderedDict
 from dotenv import load_dotenv
 
+try:
+    import brotli  # Optional: br encoding is offered only when installed
+except ImportError:
+    brotli = None
+
 load_dotenv()
 
 logging.basicConfig(
@@ -29,29 +42,164 @@ CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "OPTIONS
 class Config:
     RATE_LIMIT = 100
     MAX_RESULTS = 12
+    SEARCH_DEPTH = 120  # Top-K candidates kept per query for pagination
+    CANDIDATE_CACHE_MAX_ENTRIES = 2000
+    RESPONSE_CACHE_MAX_ENTRIES = 2000
     MAX_RECOMMENDATIONS = 6
     CACHE_TIMEOUT = 1800
+    HTTP_CACHE_MAX_AGE = 300
+    COMPRESSION_MIN_BYTES = 1024
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
     TFIDF_MAX_FEATURES = 3000
+    RECOMMEND_CONTENT_WEIGHT = 0.8
+    RECOMMEND_TITLE_WEIGHT = 0.2
+    QUERY_LOG_PATH = os.getenv(
+        "QUERY_LOG",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "queries.jsonl")
+    )
+    QUERY_LOG_SAMPLE_RATE = float(os.getenv("QUERY_LOG_SAMPLE_RATE", "0.1"))
+    QUERY_LOG_BATCH_SIZE = 100
+    QUERY_LOG_FLUSH_INTERVAL = 2.0
+    QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+    QUERY_LOG_BACKUPS = 5
+    PRECOMPUTED_CACHE_PATH = os.getenv(
+        "PRECOMPUTED_CACHE",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "precomputed_cache.bin")
+    )
 
 config = Config()
 
 class SystemState:
     def __init__(self):
         self.articles_df = None
+        self.data_path = None
         self.tfidf_vectorizer = None
         self.tfidf_matrix = None
         self.similarity_matrix = None
         self.bm25_retriever = None
+        self.bm25_full_retriever = None
+        self.bm25_num_docs = 0
         self.pt_index = None
         self.bm25_available = False
         self.tfidf_ready = False
-        self.search_cache = {}
-        self.recommendation_cache = {}
+        self.content_similarity_matrix = None
+        self.title_similarity_matrix = None
+        self.recommendations_ready = False
+        self.startup_phases = {}
+        self.startup_complete = threading.Event()
+        self.bm25_settled = threading.Event()
+        # LRU caches of (value, timestamp); see cache_get / cache_put
+        self.search_cache = OrderedDict()
+        self.recommendation_cache = OrderedDict()
+        self.candidate_cache = OrderedDict()
+        self.topic_bitsets = {}
+        self.bm25_topic_bitsets = {}
+        self.index_generation = None
+        self.precomputed_index = {}
+        self.precomputed_blob = None
+        self.precomputed_hits = 0
         self.request_count = 0
         self.lock = threading.RLock()
 
+class QueryLog:
+    """Sampled query log written asynchronously in batches to a rotating JSONL file."""
+    def __init__(self, path, sample_rate, batch_size=100, flush_interval=2.0,
+                 max_bytes=10 * 1024 * 1024, backup_count=5, max_pending=10000):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.written = 0
+        self.dropped = 0
+        self.thread = None
+        self.write_lock = threading.Lock()
+    
+    def sampled(self):
+        """Decide whether to log the current request."""
+        return bool(self.path) and self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    def record(self, entry):
+        """Queue an entry without blocking the request; drop it if the queue is full."""
+        if self.thread is None:
+            with self.write_lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, daemon=True)
+                    self.thread.start()
+        try:
+            self.pending.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+    
+    def close(self):
+        """Write out everything still queued and stop the writer thread."""
+        if self.thread is None:
+            return
+        try:
+            self.pending.put(None, timeout=1)
+        except queue.Full:
+            return
+        self.thread.join(timeout=5)
+    
+    def _run(self):
+        while True:
+            entry = self.pending.get()
+            if entry is None:
+                return
+            batch = [entry]
+            deadline = time.monotonic() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self.pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._write(batch)
+            if stopping:
+                return
+    
+    def _write(self, batch):
+        try:
+            with self.write_lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._rotate()
+                lines = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in batch)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+                self.written += len(batch)
+        except Exception as e:
+            logger.warning(f"Query log write failed: {e}")
+    
+    def _rotate(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < self.max_bytes:
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
 system = SystemState()
 rate_limit_storage = defaultdict(list)
+query_log = QueryLog(
+    config.QUERY_LOG_PATH,
+    config.QUERY_LOG_SAMPLE_RATE,
+    batch_size=config.QUERY_LOG_BATCH_SIZE,
+    flush_interval=config.QUERY_LOG_FLUSH_INTERVAL,
+    max_bytes=config.QUERY_LOG_MAX_BYTES,
+    backup_count=config.QUERY_LOG_BACKUPS
+)
+atexit.register(query_log.close)
 
 def rate_limit(max_requests=100):
     def decorator(f):
@@ -92,6 +240,237 @@ def get_cache_key(*args):
     """Generate cache key."""
     return hashlib.md5('|'.join(str(arg) for arg in args).encode()).hexdigest()[:16]
 
+def cache_get(cache, key):
+    """Return a fresh cached value and mark it recently used, or None."""
+    with system.lock:
+        entry = cache.get(key)
+        if entry is None or time.time() - entry[1] >= config.CACHE_TIMEOUT:
+            return None
+        cache.move_to_end(key)
+        return entry[0]
+
+def cache_put(cache, key, value, max_entries):
+    """Store a value, evicting the least recently used entries beyond max_entries."""
+    with system.lock:
+        cache[key] = (value, time.time())
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+def elapsed_ms(since):
+    """Milliseconds elapsed since a perf_counter timestamp."""
+    return round((time.perf_counter() - since) * 1000, 3)
+
+def log_query(endpoint, query, method, source, results, latency_ms, limit=None, offset=0, topics=None,
+              result_ids=None):
+    """Record a sampled query with its page, filters, result IDs and per-stage latency."""
+    if not query_log.sampled():
+        return
+    if result_ids is None and results is not None:
+        result_ids = [item.get("url") for item in results]
+    query_log.record({
+        "ts": time.time(),
+        "endpoint": endpoint,
+        "query": query,
+        "method": method,
+        "limit": limit,
+        "offset": offset,
+        "topics": topics or [],
+        "source": source,
+        "result_ids": result_ids,
+        "latency_ms": latency_ms,
+        "index_generation": system.index_generation
+    })
+
+def hash_file(digest, path, chunk_size=1024 * 1024):
+    """Feed a file's bytes into a running digest."""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+
+def compute_index_generation(articles):
+    """Fingerprint the data file, ranking settings and BM25 index.
+    
+    Precomputed responses, cursors and ETags are all tied to this value,
+    so anything that can change a response has to be part of it.
+    """
+    digest = hashlib.md5()
+    digest.update(
+        f"{len(articles)}|{config.TFIDF_MAX_FEATURES}|"
+        f"{config.RECOMMEND_CONTENT_WEIGHT}|{config.RECOMMEND_TITLE_WEIGHT}".encode()
+    )
+    if system.data_path and os.path.exists(system.data_path):
+        hash_file(digest, system.data_path)
+    else:
+        for title, content, url in zip(articles['title'], articles['content'], articles['url']):
+            digest.update(f"|{title}|{content}|{url}".encode('utf-8', 'ignore'))
+    
+    # data.properties records the Terrier index build (index.created, sizes)
+    bm25_properties = find_bm25_index_path()
+    digest.update(b'|bm25|')
+    if bm25_properties:
+        hash_file(digest, bm25_properties)
+    return digest.hexdigest()[:16]
+
+# Precomputed cache file layout: magic, 4-byte header length, JSON header
+# ({"index_generation", "entries": {key: [offset, length, result_ids]}}), payload blob.
+# result_ids lets query logging record precomputed hits without parsing payloads.
+PRECOMPUTED_MAGIC = b"G4GPC001"
+PRECOMPUTED_HEADER = struct.Struct(">I")
+
+def load_precomputed_cache(path=None):
+    """Memory-map precomputed responses built by precompute.py."""
+    path = path or config.PRECOMPUTED_CACHE_PATH
+    if not path or not os.path.exists(path):
+        logger.info("No precomputed cache found - serving live results only")
+        return False
+    
+    try:
+        with open(path, 'rb') as f:
+            blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic_end = len(PRECOMPUTED_MAGIC)
+        if blob[:magic_end] != PRECOMPUTED_MAGIC:
+            logger.warning(f"Ignoring precomputed cache with unknown format: {path}")
+            blob.close()
+            return False
+        
+        (header_len,) = PRECOMPUTED_HEADER.unpack_from(blob, magic_end)
+        header_start = magic_end + PRECOMPUTED_HEADER.size
+        header = json.loads(blob[header_start:header_start + header_len])
+        
+        if header.get("index_generation") != system.index_generation:
+            logger.warning("Precomputed cache was built for a different index - ignoring it")
+            blob.close()
+            return False
+        
+        # Store absolute (start, end) slices so a hit is one dict lookup plus a slice
+        base = header_start + header_len
+        index = {
+            key: (base + entry[0], base + entry[0] + entry[1], entry[2] if len(entry) > 2 else None)
+            for key, entry in header["entries"].items()
+        }
+        
+        with system.lock:
+            if system.precomputed_blob is not None:
+                system.precomputed_blob.close()
+            system.precomputed_blob = blob
+            system.precomputed_index = index
+        
+        logger.info(f"Precomputed cache loaded: {len(index)} responses from {path}")
+        return True
+        
+    except Exception as e:
+        logger.warning(f"Precomputed cache load failed: {e}")
+        return False
+
+def get_precomputed_response(cache_key):
+    """Return serialized JSON for a precomputed response, or None."""
+    span = system.precomputed_index.get(cache_key)
+    if span is None:
+        return None
+    system.precomputed_hits += 1
+    return system.precomputed_blob[span[0]:span[1]]
+
+def get_precomputed_result_ids(cache_key):
+    """Result IDs stored alongside a precomputed response, for query logging."""
+    span = system.precomputed_index.get(cache_key)
+    return span[2] if span is not None else None
+
+def normalize_topic(name):
+    """Canonical topic key shared by CSV topics, index folders and request values."""
+    name = re.sub(r'\.+.*$', '', str(name or ''))
+    return ' '.join(re.sub(r'[-_]+', ' ', name).lower().split())
+
+def parse_topics(values):
+    """Normalize repeated and comma-separated topic parameters into a sorted list."""
+    topics = {normalize_topic(part) for value in values for part in value.split(',')}
+    return sorted(topic for topic in topics if topic)
+
+def build_topic_bitsets(topics):
+    """Precompute a packed document bitset for every topic."""
+    import pandas as pd
+    
+    codes, uniques = pd.factorize(pd.Series(topics).map(normalize_topic))
+    return {topic: np.packbits(codes == i) for i, topic in enumerate(uniques) if topic}
+
+def topic_filter_mask(bitsets, topics, size):
+    """OR the bitsets of the requested topics into a boolean document mask."""
+    if not topics:
+        return None
+    combined = np.zeros((size + 7) // 8, dtype=np.uint8)
+    for topic in topics:
+        bits = bitsets.get(topic)
+        if bits is not None:
+            np.bitwise_or(combined, bits, out=combined)
+    return np.unpackbits(combined, count=size).astype(bool)
+
+def resolve_search_method(prefer_method, topics=None):
+    """Pick the search backend that will serve a request."""
+    if topics and not system.bm25_topic_bitsets:
+        # BM25 can only filter once its topic bitsets are built
+        return "tfidf" if system.tfidf_ready else None
+    if prefer_method == "bm25" and system.bm25_available:
+        return "bm25"
+    if prefer_method == "tfidf" and system.tfidf_ready:
+        return "tfidf"
+    if system.bm25_available:
+        return "bm25"
+    if system.tfidf_ready:
+        return "tfidf"
+    return None
+
+def is_compact_request():
+    """Whether the client asked for the compact response shape."""
+    return request.args.get('compact', '').lower() in ('1', 'true', 'yes')
+
+def compact_search_response(response_data):
+    """Drop per-item constant fields and the system_info block."""
+    compact = {key: value for key, value in response_data.items() if key != "system_info"}
+    compact["results"] = [
+        {key: value for key, value in item.items() if key != "method"}
+        for item in response_data["results"]
+    ]
+    return compact
+
+def compact_recommendation_response(response_data):
+    """Hoist the per-item method/weighting strings to the top level."""
+    compact = dict(response_data)
+    items = response_data["recommendations"]
+    if items:
+        compact["weighting"] = items[0]["weighting"]
+    compact["recommendations"] = [
+        {key: value for key, value in item.items() if key not in ("method", "weighting")}
+        for item in items
+    ]
+    return compact
+
+def response_etag(cache_key):
+    """Stable entity tag for a cacheable response under the current index."""
+    return f"{system.index_generation}-{cache_key}"
+
+def check_not_modified(cache_key):
+    """Remember the ETag for this response and answer 304 if the client already has it."""
+    g.etag = response_etag(cache_key)
+    if request.if_none_match.contains_weak(g.etag):
+        return app.response_class(status=304)
+    return None
+
+def find_bm25_index_path():
+    """Locate the Terrier index data.properties across deployment layouts."""
+    index_paths = [
+        "./data/geek_index/data.properties",
+        "data/geek_index/data.properties", 
+        "../data/geek_index/data.properties",
+        os.path.join(os.path.dirname(__file__), "data", "geek_index", "data.properties"),
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "geek_index", "data.properties")
+    ]
+    
+    for path in index_paths:
+        if os.path.exists(path):
+            return path
+    return None
+
 def load_articles_data():
     """Load articles data with error handling."""
     if system.articles_df is not None:
@@ -120,11 +499,17 @@ def load_articles_data():
             return None
         
         # Load and preprocess
+        import pandas as pd
         articles = pd.read_csv(data_path, low_memory=False)
         articles = articles.drop_duplicates(subset=['title'], keep='first').dropna(subset=['title'])
         articles['title'] = articles['title'].str.strip()
         articles['content'] = articles['content'].fillna('').str.strip()
         
+        # Ensure topic column (written by flatten.py)
+        if 'topic' not in articles.columns:
+            articles['topic'] = ''
+        articles['topic'] = articles['topic'].fillna('').astype(str)
+        
         # Ensure URL column
         if 'url' not in articles.columns:
             articles['url'] = articles['title'].apply(
@@ -132,6 +517,7 @@ def load_articles_data():
             )
         
         system.articles_df = articles.reset_index(drop=True)
+        system.data_path = data_path
         logger.info(f"Loaded {len(articles)} articles")
         return system.articles_df
         
@@ -139,9 +525,18 @@ def load_articles_data():
         logger.error(f"Error loading articles: {e}")
         return None
 
+def import_heavy_modules():
+    """Import pandas and scikit-learn up front so their cost is timed on its own."""
+    import pandas  # noqa: F401
+    import sklearn.feature_extraction.text  # noqa: F401
+    import sklearn.metrics.pairwise  # noqa: F401
+    return True
+
 def initialize_tfidf_system():
     """Initialize TF-IDF system for immediate search capability."""
     try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
         articles = load_articles_data()
         if articles is None:
             return False
@@ -161,6 +556,33 @@ def initialize_tfidf_system():
         # Fit and transform for search
         tfidf_matrix = vectorizer.fit_transform(combined_text)
         
+        topic_bitsets = build_topic_bitsets(articles['topic'])
+        
+        with system.lock:
+            system.tfidf_vectorizer = vectorizer
+            system.tfidf_matrix = tfidf_matrix
+            system.topic_bitsets = topic_bitsets
+            system.index_generation = compute_index_generation(articles)
+            system.candidate_cache.clear()
+            system.tfidf_ready = True
+        
+        logger.info(f"TF-IDF initialized: {tfidf_matrix.shape[0]} docs, {tfidf_matrix.shape[1]} features")
+        return True
+        
+    except Exception as e:
+        logger.error(f"TF-IDF initialization failed: {e}")
+        return False
+
+def initialize_recommendation_system():
+    """Build the content and title similarity matrices for hybrid recommendations."""
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+        
+        articles = load_articles_data()
+        if articles is None:
+            return False
+        
         # Hybrid Recommendation System: Content + Title weighting
         # Create content-based vectorizer (primary)
         content_vectorizer = TfidfVectorizer(
@@ -182,10 +604,6 @@ def initialize_tfidf_system():
         title_similarity_matrix = cosine_similarity(title_tfidf_matrix)
         
         with system.lock:
-            system.tfidf_vectorizer = vectorizer
-            system.tfidf_matrix = tfidf_matrix
-            
-            # Hybrid recommendation system storage
             system.content_vectorizer = content_vectorizer
             system.content_tfidf_matrix = content_tfidf_matrix
             system.content_similarity_matrix = content_similarity_matrix
@@ -194,13 +612,13 @@ def initialize_tfidf_system():
             system.title_tfidf_matrix = title_tfidf_matrix
             system.title_similarity_matrix = title_similarity_matrix
             
-            system.tfidf_ready = True
+            system.recommendations_ready = True
         
-        logger.info(f"TF-IDF initialized: {tfidf_matrix.shape[0]} docs, {tfidf_matrix.shape[1]} features")
+        logger.info(f"Recommendations initialized: {content_similarity_matrix.shape[0]} articles")
         return True
         
     except Exception as e:
-        logger.error(f"TF-IDF initialization failed: {e}")
+        logger.error(f"Recommendation initialization failed: {e}")
         return False
 
 def initialize_bm25_background():
@@ -214,7 +632,7 @@ def initialize_bm25_background():
             subprocess.run(['java', '-version'], capture_output=True, check=True, timeout=5)
         except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
             logger.warning("Java not available - skipping BM25 initialization")
-            return
+            return False
         
         import pyterrier as pt
         
@@ -224,117 +642,214 @@ def initialize_bm25_background():
         if not pt.started():
             pt.init()
         
-        index_paths = [
-            "./data/geek_index/data.properties",
-            "data/geek_index/data.properties", 
-            "../data/geek_index/data.properties",
-            os.path.join(os.path.dirname(__file__), "data", "geek_index", "data.properties"),
-            os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "geek_index", "data.properties")
-        ]
-        
-        index_path = None
-        for path in index_paths:
-            if os.path.exists(path):
-                index_path = path
-                break
-        
+        index_path = find_bm25_index_path()
         if not index_path:
             logger.warning("BM25 index not found - using TF-IDF only")
-            return
+            return False
         
         # Load index and create retriever
         index = pt.IndexFactory.of(index_path)
         bm25_retriever = pt.BatchRetrieve(index, wmodel="BM25")
         
+        # Filtered queries rank the whole collection, since BatchRetrieve
+        # otherwise stops at num_results=1000 before the topic mask applies
+        num_docs = index.getCollectionStatistics().getNumberOfDocuments()
+        bm25_full_retriever = pt.BatchRetrieve(index, wmodel="BM25", num_results=num_docs)
+        
+        # Topic bitsets over BM25 docids, from the article folder names flatten.py uses as topics
+        try:
+            meta_index = index.getMetaIndex()
+            folders = [
+                os.path.basename(os.path.dirname(meta_index.getItem("filename", docid) or ''))
+                for docid in range(num_docs)
+            ]
+            bm25_topic_bitsets = build_topic_bitsets(folders)
+        except Exception as e:
+            logger.warning(f"BM25 topic bitsets unavailable (topic filters use TF-IDF): {e}")
+            bm25_topic_bitsets = {}
+        
         with system.lock:
             system.pt_index = index
             system.bm25_retriever = bm25_retriever
+            system.bm25_full_retriever = bm25_full_retriever
+            system.bm25_num_docs = num_docs
+            system.bm25_topic_bitsets = bm25_topic_bitsets
             system.bm25_available = True
         
         logger.info("BM25 initialized successfully")
+        return True
         
     except Exception as e:
         logger.warning(f"BM25 initialization failed (using TF-IDF fallback): {e}")
+        return False
 
-def perform_bm25_search(query, limit=10):
-    """Perform BM25 search."""
+def bm25_candidates(query, depth, topics=None):
+    """Rank documents with BM25, returning (docids, scores) arrays."""
+    import pandas as pd
+    
+    query_df = pd.DataFrame([["q1", query]], columns=["qid", "query"])
+    retriever = system.bm25_full_retriever if topics else system.bm25_retriever
+    results = retriever.transform(query_df)
+    
+    if len(results) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    
+    # Filter the complete ranking before cutting to top-K
+    if topics:
+        mask = topic_filter_mask(system.bm25_topic_bitsets, topics, system.bm25_num_docs)
+        results = results[mask[results.docid.to_numpy(dtype=np.int64)]]
+    
+    results = results.iloc[:depth]
+    scores = results.score.to_numpy(dtype=np.float32) if hasattr(results, 'score') else np.zeros(len(results), dtype=np.float32)
+    return results.docid.to_numpy(dtype=np.int64), scores
+
+def materialize_bm25_results(doc_ids, scores):
+    """Build BM25 result items for a slice of candidates."""
+    meta_index = system.pt_index.getMetaIndex()
+    search_results = []
+    for i, (docid, score) in enumerate(zip(doc_ids, scores)):
+        try:
+            filename = meta_index.getItem("filename", int(docid))
+            title = meta_index.getItem("title", int(docid)) or filename
+            
+            url = f"https://www.geeksforgeeks.org/{filename.replace('./geek/', '').replace('index.html', '').rstrip('.html')}/"
+            
+            search_results.append({
+                "title": title.strip(),
+                "url": url,
+                "score": float(score),
+                "method": "BM25"
+            })
+        except Exception as e:
+            logger.warning(f"Error processing BM25 result {i}: {e}")
+            continue
+    
+    return search_results
+
+def perform_bm25_search(query, limit=10, offset=0, topics=None):
+    """Perform BM25 search, returning (page of results, total candidates)."""
     if not system.bm25_available:
-        return []
+        return [], 0
     
     try:
-        query_df = pd.DataFrame([["q1", query]], columns=["qid", "query"])
-        results = system.bm25_retriever.transform(query_df)
-        
-        if len(results) == 0:
-            return []
-        
-        search_results = []
-        for i in range(min(limit, len(results))):
-            try:
-                filename = system.pt_index.getMetaIndex().getItem("filename", results.docid.iloc[i])
-                title = system.pt_index.getMetaIndex().getItem("title", results.docid.iloc[i]) or filename
-                
-                url = f"https://www.geeksforgeeks.org/{filename.replace('./geek/', '').replace('index.html', '').rstrip('.html')}/"
-                
-                search_results.append({
-                    "title": title.strip(),
-                    "url": url,
-                    "score": float(results.score.iloc[i]) if hasattr(results, 'score') else 0.0,
-                    "method": "BM25"
-                })
-            except Exception as e:
-                logger.warning(f"Error processing BM25 result {i}: {e}")
-                continue
-        
-        return search_results
+        doc_ids, scores = get_search_candidates(query, "bm25", topics)
+        results = materialize_bm25_results(doc_ids[offset:offset + limit], scores[offset:offset + limit])
+        return results, len(doc_ids)
         
     except Exception as e:
         logger.error(f"BM25 search error: {e}")
-        return []
+        return [], 0
 
-def perform_tfidf_search(query, limit=10):
-    """Perform TF-IDF search with error handling."""
+def tfidf_candidates(query, depth, topics=None):
+    """Rank documents by TF-IDF cosine similarity, returning (docids, scores) arrays."""
+    from sklearn.metrics.pairwise import cosine_similarity
+    
+    query_vector = system.tfidf_vectorizer.transform([query.lower()])
+    similarities = cosine_similarity(query_vector, system.tfidf_matrix).flatten()
+    
+    # Zero out documents outside the topic filter so top-K only sees matches
+    mask = topic_filter_mask(system.topic_bitsets, topics, len(similarities))
+    if mask is not None:
+        similarities[~mask] = 0.0
+    
+    # Partial selection of the top-K, then order only those by similarity
+    depth = min(depth, len(similarities))
+    top_indices = np.argpartition(-similarities, depth - 1)[:depth]
+    top_indices = top_indices[np.argsort(-similarities[top_indices], kind='stable')]
+    top_indices = top_indices[similarities[top_indices] > 0.01]
+    
+    titles = system.articles_df['title'].iloc[top_indices].str.lower()
+    title_boost = np.where(titles.str.contains(query.lower(), regex=False).to_numpy(), 1.3, 1.0)
+    
+    return top_indices.astype(np.int64), (similarities[top_indices] * title_boost).astype(np.float32)
+
+def materialize_tfidf_results(doc_ids, scores):
+    """Build TF-IDF result items for a slice of candidates."""
+    results = []
+    for idx, score in zip(doc_ids, scores):
+        article = system.articles_df.iloc[idx]
+        results.append({
+            "title": article['title'],
+            "url": article['url'],
+            "score": float(score),
+            "method": "TF-IDF",
+            "preview": str(article['content'])[:200] + "..."
+        })
+    return results
+
+def perform_tfidf_search(query, limit=10, offset=0, topics=None):
+    """Perform TF-IDF search with error handling, returning (page of results, total candidates)."""
     if not system.tfidf_ready or system.articles_df is None:
         logger.warning("TF-IDF system not ready")
-        return []
+        return [], 0
     
     try:
-        query_vector = system.tfidf_vectorizer.transform([query.lower()])
-        similarities = cosine_similarity(query_vector, system.tfidf_matrix).flatten()
-        
-        top_indices = similarities.argsort()[-limit*2:][::-1]
-        
-        results = []
-        for idx in top_indices:
-            if len(results) >= limit or similarities[idx] <= 0.01:
-                break
-                
-            article = system.articles_df.iloc[idx]
-            title_boost = 1.3 if query.lower() in article['title'].lower() else 1.0
-            
-            results.append({
-                "title": article['title'],
-                "url": article['url'],
-                "score": float(similarities[idx] * title_boost),
-                "method": "TF-IDF",
-                "preview": str(article['content'])[:200] + "..."
-            })
-        
-        return results
+        doc_ids, scores = get_search_candidates(query, "tfidf", topics)
+        results = materialize_tfidf_results(doc_ids[offset:offset + limit], scores[offset:offset + limit])
+        return results, len(doc_ids)
         
     except Exception as e:
         logger.error(f"TF-IDF search error: {e}")
-        return []
+        return [], 0
+
+def get_search_candidates(query, method, topics=None):
+    """Return the cached top-K (docids, scores) for a query, scoring it on a miss.
+    
+    Pages are served by slicing these arrays, so later pages never rescore.
+    Entries are keyed by index generation so a reload never mixes rankings.
+    """
+    cache_key = get_cache_key("candidates", query, method, system.index_generation, ','.join(topics or []))
+    cached = cache_get(system.candidate_cache, cache_key)
+    if cached is not None:
+        return cached
+    
+    if method == "bm25":
+        doc_ids, scores = bm25_candidates(query, config.SEARCH_DEPTH, topics)
+    else:
+        doc_ids, scores = tfidf_candidates(query, config.SEARCH_DEPTH, topics)
+    
+    cache_put(system.candidate_cache, cache_key, (doc_ids, scores), config.CANDIDATE_CACHE_MAX_ENTRIES)
+    return doc_ids, scores
+
+def encode_cursor(query, method, limit, offset, topics=None):
+    """Opaque continuation token bound to the current index generation."""
+    state = {"q": query, "m": method, "l": limit, "o": offset, "t": topics or [], "g": system.index_generation}
+    raw = json.dumps(state, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
 
-def generate_recommendations(input_title, limit=6):
+def decode_cursor(cursor):
+    """Decode a continuation token, returning its state dict or None if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        state = json.loads(raw)
+        if not isinstance(state.get("q"), str) or not isinstance(state.get("o"), int) \
+                or not isinstance(state.get("l"), int) or not isinstance(state.get("t", []), list) \
+                or not all(isinstance(topic, str) for topic in state.get("t", [])) \
+                or state["l"] < 1 or state["o"] < 0:
+            return None
+        return state
+    except Exception:
+        return None
+
+def next_page_cursor(query, resolved_method, limit, offset, total_candidates, topics=None):
+    """Cursor for the page after this one, or None on the last page."""
+    next_offset = offset + limit
+    if next_offset >= min(total_candidates, config.SEARCH_DEPTH):
+        return None
+    return encode_cursor(query, resolved_method, limit, next_offset, topics)
+
+def generate_recommendations(input_title, limit=6, topics=None):
     """Generate hybrid recommendations using content-based analysis with title boosting.
     
     Args:
         input_title: The article title to find recommendations for
         limit: Maximum number of recommendations to return
+        topics: Optional topics; only articles in any of them are recommended
     """
-    if not system.tfidf_ready or system.articles_df is None:
-        logger.warning("Recommendation system not ready - missing data or TF-IDF")
+    if not system.recommendations_ready or system.articles_df is None:
+        logger.warning("Recommendation system not ready - missing data or similarity matrices")
+        return []
+    if limit < 1:
         return []
     
     try:
@@ -350,7 +865,7 @@ def generate_recommendations(input_title, limit=6):
             best_score = 0
             
             for idx, title in enumerate(articles['title']):
-                if pd.isna(title):
+                if not isinstance(title, str):
                     continue
                 title_words = set(title.lower().split())
                 overlap = len(input_words.intersection(title_words))
@@ -372,11 +887,22 @@ def generate_recommendations(input_title, limit=6):
         title_similarities = system.title_similarity_matrix[article_idx]
         
         # Combine similarities with weighted average
-        # Content gets 0.8 weight, title gets 0.2 weight
-        hybrid_similarities = (0.8 * content_similarities) + (0.2 * title_similarities)
+        # Content gets 0.8 weight, title gets 0.2 weight by default
+        hybrid_similarities = (
+            config.RECOMMEND_CONTENT_WEIGHT * content_similarities
+            + config.RECOMMEND_TITLE_WEIGHT * title_similarities
+        )
+        
+        # Exclude the article itself and anything outside the topic filter
+        hybrid_similarities[article_idx] = -1.0
+        mask = topic_filter_mask(system.topic_bitsets, topics, len(hybrid_similarities))
+        if mask is not None:
+            hybrid_similarities[~mask] = -1.0
         
         # Get top similar articles
-        similar_indices = hybrid_similarities.argsort()[-limit-1:][::-1][1:]
+        top_k = min(limit, len(hybrid_similarities))
+        similar_indices = np.argpartition(-hybrid_similarities, top_k - 1)[:top_k]
+        similar_indices = similar_indices[np.argsort(-hybrid_similarities[similar_indices], kind='stable')]
         
         recommendations = []
         for idx in similar_indices:
@@ -396,7 +922,7 @@ def generate_recommendations(input_title, limit=6):
                     "title_score": title_score,
                     "confidence": "high" if hybrid_score > 0.7 else "medium" if hybrid_score > 0.4 else "low",
                     "method": "Hybrid (Content + Title)",
-                    "weighting": "80% content, 20% title"
+                    "weighting": f"{config.RECOMMEND_CONTENT_WEIGHT:.0%} content, {config.RECOMMEND_TITLE_WEIGHT:.0%} title"
                 })
         
         return recommendations
@@ -405,6 +931,51 @@ def generate_recommendations(input_title, limit=6):
         logger.error(f"Recommendation error: {e}")
         return []
 
+def run_search(query, limit, resolved_method, offset=0, topics=None):
+    """Run a search on the resolved backend, returning (results, method label, total candidates)."""
+    if resolved_method == "bm25":
+        results, total_candidates = perform_bm25_search(query, limit, offset, topics)
+        label = "BM25"
+    elif resolved_method == "tfidf":
+        results, total_candidates = perform_tfidf_search(query, limit, offset, topics)
+        label = "TF-IDF"
+    else:
+        return [], "unavailable", 0
+    return results, label, total_candidates
+
+def build_search_response(query, results, search_method, processing_time,
+                          offset=0, total_candidates=None, next_cursor=None, topics=None):
+    """Assemble the /search response payload."""
+    return {
+        "query": query,
+        "topics": topics or [],
+        "results": results,
+        "total_results": len(results),
+        "total_candidates": total_candidates if total_candidates is not None else len(results),
+        "offset": offset,
+        "next_cursor": next_cursor,
+        "search_method": search_method,
+        "processing_time": round(processing_time, 3),
+        "cached": False,
+        "system_info": {
+            "bm25_available": system.bm25_available,
+            "tfidf_available": system.tfidf_ready
+        }
+    }
+
+def build_recommendation_response(input_title, recommendations, processing_time, topics=None):
+    """Assemble the /recommend response payload."""
+    return {
+        "input_title": input_title,
+        "topics": topics or [],
+        "recommendations": recommendations,
+        "total_recommendations": len(recommendations),
+        "processing_time": round(processing_time, 3),
+        "cached": False,
+        "algorithm": "Hybrid TF-IDF (Content 80% + Title 20%)",
+        "method": "Hybrid content-based with title boosting"
+    }
+
 # API Endpoints
 @app.route("/health", methods=["GET"])
 def health_check():
@@ -420,9 +991,13 @@ def health_check():
             "capabilities": {
                 "tfidf_search": system.tfidf_ready,
                 "bm25_search": system.bm25_available,
-                "hybrid_recommendations": system.tfidf_ready,  # Recommendations need at least TF-IDF
+                "hybrid_recommendations": system.recommendations_ready,
                 "data_loaded": system.articles_df is not None
             },
+            "startup": {
+                "complete": system.startup_complete.is_set(),
+                "phases": startup_phases_snapshot()
+            },
             "system_info": {
                 "articles_count": len(system.articles_df) if system.articles_df is not None else 0,
                 "tfidf_ready": system.tfidf_ready,
@@ -430,7 +1005,11 @@ def health_check():
             },
             "metrics": {
                 "total_requests": system.request_count,
-                "cache_entries": len(system.search_cache) + len(system.recommendation_cache)
+                "cache_entries": len(system.search_cache) + len(system.recommendation_cache),
+                "precomputed_entries": len(system.precomputed_index),
+                "precomputed_hits": system.precomputed_hits,
+                "query_log_written": query_log.written,
+                "query_log_dropped": query_log.dropped
             }
         })
     except Exception as e:
@@ -441,47 +1020,103 @@ def health_check():
             "timestamp": datetime.now().isoformat()
         }), 200  # Still return 200 so load balancer doesn't think service is down
 
+@app.route("/health/live", methods=["GET"])
+def liveness_check():
+    """Liveness: the process is up and serving HTTP."""
+    return jsonify({"status": "alive", "timestamp": datetime.now().isoformat()})
+
+@app.route("/health/ready", methods=["GET"])
+def readiness_check():
+    """Readiness: search can be served; recommendations and BM25 may still be loading."""
+    ready = system.tfidf_ready
+    return jsonify({
+        "ready": ready,
+        "components": {
+            "search": system.tfidf_ready,
+            "recommendations": system.recommendations_ready,
+            "bm25": system.bm25_available
+        },
+        "startup_complete": system.startup_complete.is_set(),
+        "phases": startup_phases_snapshot()
+    }), 200 if ready else 503
+
 @app.route("/search", methods=["GET"])
 @rate_limit(max_requests=config.RATE_LIMIT)
 def search():
     """Search endpoint with BM25 and TF-IDF."""
     start_time = time.time()
+    request_start = time.perf_counter()
     
     try:
-        query_text = request.args.get('q', '').strip()
-        limit = min(int(request.args.get('limit', config.MAX_RESULTS)), config.MAX_RESULTS)
-        prefer_method = request.args.get('method', '').lower()
+        cursor = request.args.get('cursor', '').strip()
+        if cursor:
+            # Continuation: query, method and page size all come from the cursor
+            state = decode_cursor(cursor)
+            if state is None:
+                return jsonify({"error": "Invalid cursor"}), 400
+            if state.get("g") != system.index_generation:
+                return jsonify({"error": "Cursor expired - index was reloaded, restart the search"}), 410
+            query_text = state["q"]
+            limit = min(state["l"], config.MAX_RESULTS)
+            offset = state["o"]
+            prefer_method = str(state.get("m") or "")
+            topics = parse_topics(state.get("t") or [])
+        else:
+            query_text = request.args.get('q', '').strip()
+            try:
+                limit = min(int(request.args.get('limit', config.MAX_RESULTS)), config.MAX_RESULTS)
+                offset = int(request.args.get('offset', 0))
+            except ValueError:
+                return jsonify({"error": "limit and offset must be integers"}), 400
+            prefer_method = request.args.get('method', '').lower()
+            topics = parse_topics(request.args.getlist('topic'))
+        
+        if limit < 1:
+            return jsonify({"error": "limit must be at least 1"}), 400
+        if offset < 0 or offset >= config.SEARCH_DEPTH:
+            return jsonify({"error": f"offset must be between 0 and {config.SEARCH_DEPTH - 1}"}), 400
+        limit = min(limit, config.SEARCH_DEPTH - offset)
         
         # Validate input
         is_valid, sanitized_query, error_msg = validate_input(query_text)
         if not is_valid:
             return jsonify({"error": error_msg}), 400
         
+        compact = is_compact_request()
+        lookup_start = time.perf_counter()
+        resolved_method = resolve_search_method(prefer_method, topics)
+        
+        # Cache key doubles as the ETag, so conditional requests skip all lookups
+        cache_key = get_cache_key("search", sanitized_query, limit, resolved_method, offset,
+                                  system.index_generation, ','.join(topics), compact)
+        not_modified = check_not_modified(cache_key)
+        if not_modified is not None:
+            return not_modified
+        
+        # Precomputed head queries are keyed by the backend that would serve them
+        precomputed_key = get_cache_key("search", sanitized_query, limit, resolved_method)
+        payload = get_precomputed_response(precomputed_key) \
+            if offset == 0 and not topics and not compact else None
+        if payload is not None:
+            log_query("search", sanitized_query, resolved_method, "precomputed", None,
+                      {"lookup": elapsed_ms(lookup_start), "total": elapsed_ms(request_start)},
+                      limit=limit, offset=offset, topics=topics,
+                      result_ids=get_precomputed_result_ids(precomputed_key))
+            return app.response_class(payload, mimetype="application/json")
+        
         # Check cache
-        cache_key = get_cache_key("search", sanitized_query, limit, prefer_method)
-        if cache_key in system.search_cache:
-            cached_result, timestamp = system.search_cache[cache_key]
-            if time.time() - timestamp < config.CACHE_TIMEOUT:
-                cached_result["cached"] = True
-                return jsonify(cached_result)
+        cached_result = cache_get(system.search_cache, cache_key)
+        if cached_result is not None:
+            cached_result["cached"] = True
+            log_query("search", sanitized_query, cached_result["search_method"], "cache",
+                      cached_result["results"],
+                      {"lookup": elapsed_ms(lookup_start), "total": elapsed_ms(request_start)},
+                      limit=limit, offset=offset, topics=topics)
+            return jsonify(cached_result)
+        lookup_ms = elapsed_ms(lookup_start)
         
         # Perform search
-        results = []
-        search_method = "unavailable"
-        
-        if prefer_method == "bm25" and system.bm25_available:
-            results = perform_bm25_search(sanitized_query, limit)
-            search_method = "BM25"
-        elif prefer_method == "tfidf" and system.tfidf_ready:
-            results = perform_tfidf_search(sanitized_query, limit)
-            search_method = "TF-IDF"
-        elif system.bm25_available:
-            results = perform_bm25_search(sanitized_query, limit)
-            search_method = "BM25"
-        elif system.tfidf_ready:
-            results = perform_tfidf_search(sanitized_query, limit)
-            search_method = "TF-IDF"
-        else:
+        if resolved_method is None:
             # No search methods available
             return jsonify({
                 "error": "Search system not available - initializing",
@@ -493,23 +1128,27 @@ def search():
                 }
             }), 503  # Service Unavailable
         
-        processing_time = time.time() - start_time
-        
-        response_data = {
-            "query": sanitized_query,
-            "results": results,
-            "total_results": len(results),
-            "search_method": search_method,
-            "processing_time": round(processing_time, 3),
-            "cached": False,
-            "system_info": {
-                "bm25_available": system.bm25_available,
-                "tfidf_available": system.tfidf_ready
-            }
-        }
+        retrieval_start = time.perf_counter()
+        results, search_method, total_candidates = run_search(
+            sanitized_query, limit, resolved_method, offset, topics
+        )
+        retrieval_ms = elapsed_ms(retrieval_start)
+        response_data = build_search_response(
+            sanitized_query, results, search_method, time.time() - start_time,
+            offset=offset,
+            total_candidates=total_candidates,
+            next_cursor=next_page_cursor(sanitized_query, resolved_method, limit, offset,
+                                         total_candidates, topics),
+            topics=topics
+        )
+        if compact:
+            response_data = compact_search_response(response_data)
         
         # Cache results
-        system.search_cache[cache_key] = (response_data, time.time())
+        cache_put(system.search_cache, cache_key, response_data, config.RESPONSE_CACHE_MAX_ENTRIES)
+        log_query("search", sanitized_query, search_method, "live", results,
+                  {"lookup": lookup_ms, "retrieval": retrieval_ms, "total": elapsed_ms(request_start)},
+                  limit=limit, offset=offset, topics=topics)
         
         logger.info(f"Search: '{sanitized_query}' -> {len(results)} results via {search_method}")
         return jsonify(response_data)
@@ -523,13 +1162,20 @@ def search():
 def recommend():
     """Recommendation endpoint."""
     start_time = time.time()
+    request_start = time.perf_counter()
     
     try:
         input_title = request.args.get('title', '').strip()
-        limit = min(int(request.args.get('limit', config.MAX_RECOMMENDATIONS)), config.MAX_RECOMMENDATIONS)
+        try:
+            limit = min(int(request.args.get('limit', config.MAX_RECOMMENDATIONS)), config.MAX_RECOMMENDATIONS)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        topics = parse_topics(request.args.getlist('topic'))
         
         if not input_title:
             return jsonify({"error": "title parameter required"}), 400
+        if limit < 1:
+            return jsonify({"error": "limit must be at least 1"}), 400
         
         # Validate input
         is_valid, sanitized_title, error_msg = validate_input(input_title, 200)
@@ -537,29 +1183,57 @@ def recommend():
             return jsonify({"error": error_msg}), 400
         
         # Check cache
-        cache_key = get_cache_key("recommend", sanitized_title, limit)
-        if cache_key in system.recommendation_cache:
-            cached_result, timestamp = system.recommendation_cache[cache_key]
-            if time.time() - timestamp < config.CACHE_TIMEOUT:
-                cached_result["cached"] = True
-                return jsonify(cached_result)
+        compact = is_compact_request()
+        lookup_start = time.perf_counter()
+        key_args = ["recommend", sanitized_title, limit]
+        if topics:
+            key_args.append(f"topics={','.join(topics)}")
+        if compact:
+            key_args.append("compact")
+        cache_key = get_cache_key(*key_args)
+        not_modified = check_not_modified(cache_key)
+        if not_modified is not None:
+            return not_modified
+        
+        payload = get_precomputed_response(cache_key)
+        if payload is not None:
+            log_query("recommend", sanitized_title, "hybrid", "precomputed", None,
+                      {"lookup": elapsed_ms(lookup_start), "total": elapsed_ms(request_start)},
+                      limit=limit, topics=topics,
+                      result_ids=get_precomputed_result_ids(cache_key))
+            return app.response_class(payload, mimetype="application/json")
+        
+        cached_result = cache_get(system.recommendation_cache, cache_key)
+        if cached_result is not None:
+            cached_result["cached"] = True
+            log_query("recommend", sanitized_title, "hybrid", "cache",
+                      cached_result["recommendations"],
+                      {"lookup": elapsed_ms(lookup_start), "total": elapsed_ms(request_start)},
+                      limit=limit, topics=topics)
+            return jsonify(cached_result)
+        lookup_ms = elapsed_ms(lookup_start)
+        
+        if not system.recommendations_ready:
+            return jsonify({
+                "error": "Recommendation system not available - initializing",
+                "input_title": sanitized_title
+            }), 503  # Service Unavailable
         
         # Generate hybrid recommendations
-        recommendations = generate_recommendations(sanitized_title, limit)
-        processing_time = time.time() - start_time
-        
-        response_data = {
-            "input_title": sanitized_title,
-            "recommendations": recommendations,
-            "total_recommendations": len(recommendations),
-            "processing_time": round(processing_time, 3),
-            "cached": False,
-            "algorithm": "Hybrid TF-IDF (Content 80% + Title 20%)",
-            "method": "Hybrid content-based with title boosting"
-        }
+        retrieval_start = time.perf_counter()
+        recommendations = generate_recommendations(sanitized_title, limit, topics)
+        retrieval_ms = elapsed_ms(retrieval_start)
+        response_data = build_recommendation_response(
+            sanitized_title, recommendations, time.time() - start_time, topics
+        )
+        if compact:
+            response_data = compact_recommendation_response(response_data)
         
         # Cache results
-        system.recommendation_cache[cache_key] = (response_data, time.time())
+        cache_put(system.recommendation_cache, cache_key, response_data, config.RESPONSE_CACHE_MAX_ENTRIES)
+        log_query("recommend", sanitized_title, "hybrid", "live", recommendations,
+                  {"lookup": lookup_ms, "retrieval": retrieval_ms, "total": elapsed_ms(request_start)},
+                  limit=limit, topics=topics)
         
         logger.info(f"Recommendations: '{sanitized_title}' -> {len(recommendations)} items")
         return jsonify(response_data)
@@ -579,8 +1253,10 @@ def root():
         "status": "Live & Optimized",
         "endpoints": {
             "health": "/health - System diagnostics & capabilities",
-            "search": "/search?q=<query>&limit=<num>&method=<algorithm>",
-            "recommend": "/recommend?title=<title>&limit=<num>"
+            "liveness": "/health/live - Process is up",
+            "readiness": "/health/ready - Search index loaded (503 while starting)",
+            "search": "/search?q=<query>&limit=<num>&method=<algorithm>&offset=<num>&topic=<topic>&compact=1 or /search?cursor=<next_cursor>",
+            "recommend": "/recommend?title=<title>&limit=<num>&topic=<topic>&compact=1"
         },
         "core_technologies": [
             "Machine Learning (TF-IDF, Cosine Similarity)",
@@ -614,42 +1290,126 @@ def root():
         }
     })
 
+@app.after_request
+def finalize_response(response):
+    """Attach ETag/cache headers and compress large bodies."""
+    etag = g.get('etag')
+    if etag and response.status_code in (200, 304):
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = f"public, max-age={config.HTTP_CACHE_MAX_AGE}"
+    
+    if response.status_code != 200 or response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < config.COMPRESSION_MIN_BYTES:
+        return response
+    
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        response.set_data(brotli.compress(body, quality=config.BROTLI_QUALITY))
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        response.set_data(gzip.compress(body, compresslevel=config.GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({"error": "Endpoint not found", "available": ["/", "/health", "/search", "/recommend"]}), 404
+    return jsonify({"error": "Endpoint not found", "available": ["/", "/health", "/health/live", "/health/ready", "/search", "/recommend"]}), 404
 
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
+def run_phase(name, func):
+    """Run one startup phase, recording its status and duration."""
+    record = {"status": "running", "started_at": round(time.time() - app.start_time, 3)}
+    with system.lock:
+        system.startup_phases[name] = record
+    start = time.perf_counter()
+    status = "error"
+    try:
+        result = func()
+        status = "done" if result is not None and result is not False else "unavailable"
+        return result
+    except Exception as e:
+        logger.error(f"Startup phase '{name}' failed: {e}")
+        return None
+    finally:
+        with system.lock:
+            record["status"] = status
+            record["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(f"Startup phase '{name}': {record['status']} in {record['seconds']}s")
+
+def startup_phases_snapshot():
+    """Copy of the startup phase records, taken under the system lock."""
+    with system.lock:
+        return {name: dict(record) for name, record in system.startup_phases.items()}
+
+def wait_for_startup(timeout=None):
+    """Block until the staged startup has finished; used by offline scripts."""
+    return system.startup_complete.wait(timeout)
+
+def wait_for_bm25(timeout=None):
+    """Block until the background BM25 phase has finished, whatever its outcome."""
+    return system.bm25_settled.wait(timeout)
+
+def initialize_bm25_phase():
+    try:
+        run_phase("bm25", initialize_bm25_background)
+    finally:
+        system.bm25_settled.set()
+
 def initialize_system():
-    """Initialize system with optimal startup and graceful fallbacks."""
+    """Initialize system in stages: search first, then recommendations, BM25 in background."""
+    bm25_started = False
     try:
-        app.start_time = time.time()
         logger.info("Starting GeeksforGeeks Optimal System...")
         
-        # Phase 1: TF-IDF for immediate availability
-        tfidf_success = initialize_tfidf_system()
-        if tfidf_success:
+        # Phase 1: heavy imports and data, then TF-IDF search for readiness
+        run_phase("imports", import_heavy_modules)
+        run_phase("data", load_articles_data)
+        if run_phase("search_index", initialize_tfidf_system):
             logger.info("TF-IDF ready - search available")
         else:
             logger.warning("TF-IDF initialization failed - limited functionality")
         
+        # Precomputed responses are tied to the index generation computed above
+        run_phase("precomputed_cache", load_precomputed_cache)
+        
         # Phase 2: BM25 in background (non-blocking)
-        threading.Thread(target=initialize_bm25_background, daemon=True).start()
+        threading.Thread(target=initialize_bm25_phase, daemon=True).start()
+        bm25_started = True
+        
+        # Phase 3: recommendation neighbors once search is already serving
+        if run_phase("recommendations", initialize_recommendation_system):
+            logger.info("Hybrid recommendations ready")
         
         logger.info("System initialization complete")
-        return True  # Always return True to allow server to start
         
     except Exception as e:
         logger.error(f"System initialization error: {e}")
-        return True  # Still allow server to start with basic functionality
+        # BM25 never started, so nothing will settle it
+        if not bm25_started:
+            system.bm25_settled.set()
+    finally:
+        system.startup_complete.set()
+    return True  # Always return True to allow server to start
 
-# Initialize system immediately when module is imported (for Gunicorn)
+# Start initialization in the background when the module is imported (for Gunicorn),
+# so the worker can bind and answer liveness checks while indexes build
+app.start_time = time.time()
+system.startup_phases["module_import"] = {
+    "status": "done",
+    "started_at": 0.0,
+    "seconds": round(time.perf_counter() - _module_import_start, 3)
+}
 try:
-    initialize_system()
-    logger.info("System initialized for production deployment")
+    threading.Thread(target=initialize_system, name="startup", daemon=True).start()
+    logger.info("System initialization started for production deployment")
 except Exception as e:
     logger.error(f"System initialization failed: {e}")
     # Don't exit, let the app start with basic functionality
@@ -662,8 +1422,7 @@ if __name__ == "__main__":
         debug = os.getenv('FLASK_ENV') == 'development'
         
         logger.info(f"Server starting on {host}:{port}")
-        logger.info(f"TF-IDF: {system.tfidf_ready}, BM25: {'initializing' if not system.bm25_available else 'ready'}")
-        logger.info(f"Total articles loaded: {len(system.articles_df) if system.articles_df is not None else 0}")
+        logger.info("Indexes load in the background - see /health/ready for startup progress")
         
         app.run(host=host, port=port, debug=debug, threaded=True)
         